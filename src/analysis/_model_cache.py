@@ -0,0 +1,160 @@
+"""
+Process-wide cache for hanlp models.
+
+Every checkpoint is loaded at most once per process, no matter how many
+pipelines use it, and only when it is first called.
+"""
+import contextlib
+import functools
+import logging
+import os
+import sys
+import threading
+
+import hanlp
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Set HANLP_QUANTIZE=int8 to run the models with dynamically quantized INT8
+# Linear layers. Only applies on CPU, and trades a little accuracy for speed.
+QUANTIZE = os.getenv("HANLP_QUANTIZE", "").lower() == "int8"
+
+# hanlp.load already places the models on the GPU when there is one; inference
+# then runs under FP16 autocast unless HANLP_FP16=0.
+FP16 = torch.cuda.is_available() and os.getenv("HANLP_FP16", "1") != "0"
+
+# Set HANLP_COMPILE=1 to compile the models' forward passes with torch.compile.
+# The first calls of every new input shape are slow while kernels are built.
+COMPILE = os.getenv("HANLP_COMPILE", "") == "1"
+
+# Number of sentences per forward pass. Request batches larger than this are
+# cut into chunks of this size by the models.
+BATCH_SIZE = int(os.getenv("HANLP_BATCH_SIZE", "32"))
+
+# Set HANLP_TORCH_THREADS to cap the intra-op threads of each process, e.g. to
+# cores / workers when running uvicorn with several workers; by default torch
+# uses one thread per core, which oversubscribes the CPU across workers.
+TORCH_THREADS = int(os.getenv("HANLP_TORCH_THREADS", "0"))
+
+_lock = threading.RLock()
+# one call lock per loaded model, shared by every proxy of that model
+_call_locks = {}
+
+
+def has_gpu() -> bool:
+    """
+    Check if a GPU is available for use
+    Returns: True if GPU is available, False otherwise
+    """
+    return torch.cuda.is_available()
+
+
+def _configure_torch():
+    if TORCH_THREADS > 0:
+        torch.set_num_threads(TORCH_THREADS)
+    if has_gpu():
+        # FP32 matmuls that run outside of FP16 autocast may use TF32
+        torch.set_float32_matmul_precision("high")
+
+
+def _quantize(component):
+    """
+    Swap the Linear layers of a loaded hanlp component for dynamically quantized
+    INT8 ones, when HANLP_QUANTIZE=int8 and the model runs on CPU
+    """
+    if not QUANTIZE or has_gpu():
+        return component
+    component.model = torch.ao.quantization.quantize_dynamic(
+        component.model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return component
+
+
+def _intern_tags(component):
+    """
+    Intern the tag vocabulary of a tagger, so the tags it returns are shared
+    interned strings that compare by identity against interned filters
+    """
+    vocabs = getattr(component, 'vocabs', None)
+    vocab = vocabs.get('tag') if vocabs is not None else None
+    if vocab is not None and vocab.idx_to_token:
+        vocab.idx_to_token[:] = [sys.intern(tag) for tag in vocab.idx_to_token]
+    return component
+
+
+def _compile(component):
+    """
+    Compile the forward pass of a loaded hanlp component, when HANLP_COMPILE=1
+    """
+    if not COMPILE:
+        return component
+    # CUDA graphs only pay off on GPU; batch and sequence lengths vary per call
+    mode = "reduce-overhead" if has_gpu() else None
+    component.model = torch.compile(component.model, mode=mode, dynamic=True)
+    return component
+
+
+def _autocast():
+    if FP16:
+        return torch.autocast("cuda", dtype=torch.float16)
+    return contextlib.nullcontext()
+
+
+@functools.lru_cache(maxsize=None)
+def _load(name: str):
+    component = _intern_tags(_quantize(hanlp.load(name)))
+    component.model.eval()
+    return _compile(component)
+
+
+def get(name: str):
+    """
+    Load the hanlp checkpoint `name`, or return the instance loaded earlier
+    """
+    # the lock keeps two threads from loading the same checkpoint concurrently
+    with _lock:
+        return _load(name)
+
+
+class LazyProxy:
+    """
+    Stand-in for a model that is loaded by `loader` on first use.
+
+    Calls and attribute access are forwarded to the loaded model, so a proxy can
+    be appended to a hanlp pipeline like the model itself. Calls run under
+    inference mode, and under FP16 autocast on GPU, with HANLP_BATCH_SIZE as the
+    default batch size.
+
+    Calls to the same model are serialized, also across proxies of the same
+    cached model: hanlp components keep per-call state in their tokenizers,
+    while different models can still run concurrently.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._model = None
+        self._call_lock = None
+
+    def _get(self):
+        if self._model is None:
+            with _lock:
+                if self._model is None:
+                    model = self._loader()
+                    self._call_lock = _call_locks.setdefault(id(model), threading.Lock())
+                    self._model = model
+        return self._model
+
+    def __call__(self, *args, **kwargs):
+        model = self._get()
+        kwargs.setdefault('batch_size', BATCH_SIZE)
+        with self._call_lock, torch.inference_mode(), _autocast():
+            return model(*args, **kwargs)
+
+    def __getattr__(self, item):
+        if item.startswith('_'):
+            raise AttributeError(item)
+        return getattr(self._get(), item)
+
+
+_configure_torch()
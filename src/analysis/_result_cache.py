@@ -0,0 +1,43 @@
+"""
+LRU cache of analysis results.
+
+Repeated texts (duplicate documents, retried requests) are answered without
+running the models again. Cached responses are shared between callers, so they
+must not be modified.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Number of results kept per cache; HANLP_RESULT_CACHE_SIZE=0 disables caching
+RESULT_CACHE_SIZE = int(os.getenv("HANLP_RESULT_CACHE_SIZE", "1024"))
+
+
+class ResultCache:
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE):
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self._maxsize:
+            return None
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if not self._maxsize:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
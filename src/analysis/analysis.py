@@ -1,9 +1,13 @@
+import itertools
 import logging
-from typing import List, Tuple, Optional, Set, Any
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Optional, Set, Any, FrozenSet
 
 import hanlp
-import torch
 
+from src.analysis._model_cache import LazyProxy, get as get_model, has_gpu
+from src.analysis._result_cache import ResultCache
 from src.analysis.models import AnalysisResponse, Term, NamedEntity, \
     FineCoarseAnalysisResponse
 from src.split_sentence import split_sentence_with_index
@@ -13,20 +17,14 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def has_gpu() -> bool:
-    """
-    Check if a GPU is available for use
-    Returns: True if GPU is available, False otherwise
-    """
-    return torch.cuda.is_available()
-
-
 # Add this before loading models
 if has_gpu():
     logger.info("GPU is available - models will run on GPU")
 else:
     logger.info("No GPU detected - models will run on CPU")
 
+SENTENCES_WITH_INDICES = "sentences_with_indices"
+PARAGRAPH_SIZES = "paragraph_sizes"
 TOKEN_WITH_SPAN = "token_with_span"
 TOKEN = "token"
 POS_CTB = "pos_ctb"
@@ -37,9 +35,36 @@ TERMS = "terms"
 # Text length threshold for using paragraph pipeline (in characters)
 TEXT_LENGTH_THRESHOLD = 120
 
-# Load models with device info logging
-__tok_fine = hanlp.load(hanlp.pretrained.tok.FINE_ELECTRA_SMALL_ZH)
-logger.info(f"Fine tokenizer loaded on device: {__tok_fine.device}")
+# Result for blank texts, which never reach the models. Shared by every
+# request, like cached results, so it must not be modified.
+_EMPTY_RESPONSE = AnalysisResponse.model_construct(terms=[], named_entities=[])
+
+# Runs the fine and coarse halves of fine-coarse analysis side by side
+_executor = ThreadPoolExecutor(thread_name_prefix="analysis")
+
+
+def __lazy_model(name: str, label: str, output_spans: bool = False) -> LazyProxy:
+    """
+    Models are fetched from the process-wide cache on first use,
+    so importing this module doesn't load anything
+    """
+    def __load():
+        model = get_model(name)
+        if output_spans:
+            model.config.output_spans = True
+        logger.info(f"{label} loaded on device: {model.device}")
+        return model
+    return LazyProxy(__load)
+
+
+# HanLP支持输出每个单词在文本中的原始位置，以便用于搜索引擎等场景。
+# 在词法分析中，非语素字符（空格、换行、制表符等）会被剔除，此时需要额外的位置信息才能定位每个单词
+# 通过 config.output_spans = True
+# 返回格式为三元组（单词，单词的起始下标，单词的终止下标），下标以字符级别计量。
+# https://github.com/hankcs/HanLP/issues/1802#issuecomment-1399534301
+# 但由于我们会把文本先拆成句子，此时返回位置是句子的位置，因此就作用不大了
+__tok_fine = __lazy_model(hanlp.pretrained.tok.FINE_ELECTRA_SMALL_ZH,
+                          "Fine tokenizer", output_spans=True)
 
 # 有时 粗分表现更好
 # e.g. 麻烦找一下新氧相关的专家：
@@ -52,30 +77,17 @@ logger.info(f"Fine tokenizer loaded on device: {__tok_fine.device}")
 # e.g.
 # 巴比食品、三津汤包、庆丰包子、武汉好礼客、上海早阳、南京青露、杭州甘其食等中国早餐包子店行业从业公司
 # 杭州甘其食 可能更应该算作两个 token.
-__tok_coarse = hanlp.load(hanlp.pretrained.tok.COARSE_ELECTRA_SMALL_ZH)
-logger.info(f"Coarse tokenizer loaded on device: {__tok_coarse.device}")
-
-# HanLP支持输出每个单词在文本中的原始位置，以便用于搜索引擎等场景。
-# 在词法分析中，非语素字符（空格、换行、制表符等）会被剔除，此时需要额外的位置信息才能定位每个单词
-# 通过 config.output_spans = True
-# 返回格式为三元组（单词，单词的起始下标，单词的终止下标），下标以字符级别计量。
-# https://github.com/hankcs/HanLP/issues/1802#issuecomment-1399534301
-# 但由于我们会把文本先拆成句子，此时返回位置是句子的位置，因此就作用不大了
-__tok_fine.config.output_spans = True
-__tok_coarse.config.output_spans = True
-
-__ner = hanlp.load(hanlp.pretrained.ner.MSRA_NER_ELECTRA_SMALL_ZH)
-logger.info(f"NER model loaded on device: {__ner.device}")
+__tok_coarse = __lazy_model(hanlp.pretrained.tok.COARSE_ELECTRA_SMALL_ZH,
+                            "Coarse tokenizer", output_spans=True)
 
-__pos_ctb9 = hanlp.load(hanlp.pretrained.pos.CTB9_POS_ELECTRA_SMALL)
-logger.info(f"CTB POS tagger loaded on device: {__pos_ctb9.device}")
-
-__pos_pku = hanlp.load(hanlp.pretrained.pos.PKU_POS_ELECTRA_SMALL)
-logger.info(f"PKU POS tagger loaded on device: {__pos_pku.device}")
+__ner = __lazy_model(hanlp.pretrained.ner.MSRA_NER_ELECTRA_SMALL_ZH, "NER model")
+__pos_ctb9 = __lazy_model(hanlp.pretrained.pos.CTB9_POS_ELECTRA_SMALL, "CTB POS tagger")
+__pos_pku = __lazy_model(hanlp.pretrained.pos.PKU_POS_ELECTRA_SMALL, "PKU POS tagger")
 
 
 def __sum(sentences: List):
-    return sum(sentences, [])
+    # sum(sentences, []) would copy the accumulated list on every addition
+    return list(itertools.chain.from_iterable(sentences))
 
 
 def __zip_sentence(*args) -> List[Term]:
@@ -91,35 +103,33 @@ def __zip_sentence(*args) -> List[Term]:
     return res
 
 
-def __zip_sentence_with_span(*args) -> List[Term]:
-    tok, pos9, posp = args
-    res = []
-    for t, p9, pp in zip(tok, pos9, posp):
-        res.append(Term(
-            token=t[0],
-            pos_ctb=p9,
-            pos_pku=pp,
-            span=(t[1], t[2])
-        ))
-    return res
-
-
-def __zip_for_paragraph(*args) -> List[Term]:
-    token, pos_ctb9, pos_pku = args
-    res = []
-    for tok, pos9, posp in zip(token, pos_ctb9, pos_pku):
-        ret = __zip_sentence_with_span(tok, pos9, posp)
-        res.extend(ret)
-    return res
+def _filter_term_indices(
+        pos_ctb: List[str],
+        pos_pku: List[str],
+        allow_pos_ctb: Optional[Set[str]] = None,
+        allow_pos_pku: Optional[Set[str]] = None,
+) -> range | List[int]:
+    """
+    Indices of the tokens whose tags pass every filter that is given, in a single pass
+    """
+    if not allow_pos_ctb and not allow_pos_pku:
+        return range(len(pos_ctb))
+    return [
+        i for i, (p9, pp) in enumerate(zip(pos_ctb, pos_pku))
+        if (not allow_pos_ctb or p9 in allow_pos_ctb)
+        and (not allow_pos_pku or pp in allow_pos_pku)
+    ]
 
 
-def __zip_for_sentence(*args) -> List[List[Term]]:
-    token, pos_ctb9, pos_pku = args
-    res = []
-    for tok, pos9, posp in zip(token, pos_ctb9, pos_pku):
-        ret = __zip_sentence_with_span(tok, pos9, posp)
-        res.append(ret)
-    return res
+def _normalize_tags(tags: Optional[Set[str]]) -> Optional[FrozenSet[str]]:
+    """
+    Freeze a tag filter once per batch, with interned tags.
+    The taggers return interned tags from their vocabulary (see _model_cache),
+    so membership tests succeed on identity before comparing characters.
+    """
+    if not tags:
+        return None
+    return frozenset(sys.intern(tag) for tag in tags)
 
 
 def _filter_terms(
@@ -127,12 +137,18 @@ def _filter_terms(
         allow_pos_ctb: Optional[Set[str]] = None,
         allow_pos_pku: Optional[Set[str]] = None,
 ) -> List[Term]:
-    res = terms
-    if allow_pos_ctb:
-        res = [term for term in terms if term.pos_ctb in allow_pos_ctb]
-    if allow_pos_pku:
-        res = [term for term in terms if term.pos_pku in allow_pos_pku]
-    return res
+    """
+    Keep the terms whose tags pass every filter that is given
+    """
+    if not allow_pos_ctb and not allow_pos_pku:
+        return terms
+    keep = _filter_term_indices(
+        [term.pos_ctb for term in terms],
+        [term.pos_pku for term in terms],
+        allow_pos_ctb=allow_pos_ctb,
+        allow_pos_pku=allow_pos_pku
+    )
+    return [terms[i] for i in keep]
 
 
 def __remove_span(token_with_span):
@@ -141,16 +157,40 @@ def __remove_span(token_with_span):
         res.append([item[0] for item in items])
     return res
 
+def __length_order(batch: List) -> List[int]:
+    """
+    Indices of batch sorted by length. The models cut their input into fixed-size
+    batches in the order given, so feeding them sorted input keeps the padding
+    within each batch small.
+    """
+    return sorted(range(len(batch)), key=lambda i: len(batch[i]))
+
+
+def __unsort(order: List[int], sorted_results: List) -> List:
+    """
+    Put results computed for the batch sorted by `order` back in batch order
+    """
+    res = [None] * len(order)
+    for i, result in zip(order, sorted_results):
+        res[i] = result
+    return res
+
+
 def __token_with_indices(token_fn):
     def __token_with_indices_fn(sent_with_index):
         sents = [item[0] for item in sent_with_index]
-        res: List[List[List[Any]]] = token_fn(sents)
-        for i, items in enumerate(res):
-            index = sent_with_index[i][1]
-            for item in items:
-                item[1] = item[1] + index
-                item[2] = item[2] + index
-        return res
+        order = __length_order(sents)
+        res: List[List[List[Any]]] = __unsort(order, token_fn([sents[i] for i in order]))
+        # shift the spans and strip them for the taggers in the same walk
+        tokens = []
+        for items, (_, index) in zip(res, sent_with_index):
+            # the first sentence of every paragraph starts at 0
+            if index:
+                for item in items:
+                    item[1] += index
+                    item[2] += index
+            tokens.append([item[0] for item in items])
+        return res, tokens
     return __token_with_indices_fn
 
 # def __token_with_indices(token_fn):
@@ -165,15 +205,70 @@ def __token_with_indices(token_fn):
 #     return __token_with_indices_fn
 
 
-def __ner_with_offset(tokens: List[List[str]]):
-    named_entities: List[List[Tuple[str, str, int, int]]] = __ner(tokens)
-    offset = 0
-    for i, items in enumerate(named_entities):
-        if i > 0:
-            offset += len(tokens[i-1])
-        for j, ne in enumerate(items):
-            named_entities[i][j] = ne[0], ne[1], ne[2] + offset, ne[3] + offset
-    return named_entities
+def __split_paragraphs(texts: List[str]):
+    """
+    Split every paragraph into sentences, so the sentences of all paragraphs can
+    go through the models as a single batch.
+    Returns the flattened (sentence, index) pairs and the number of sentences
+    each paragraph contributed.
+    """
+    sentences_with_indices = []
+    paragraph_sizes = []
+    for text in texts:
+        sentences = list(split_sentence_with_index(text))
+        sentences_with_indices.extend(sentences)
+        paragraph_sizes.append(len(sentences))
+    return sentences_with_indices, paragraph_sizes
+
+
+def __merge_paragraphs(tokens, pos_ctb, pos_pku, named_entities, paragraph_sizes: List[int]):
+    """
+    Regroup per-sentence results into one entry per paragraph.
+    Entity offsets are token indices within a sentence, so they are shifted by
+    the number of tokens of the preceding sentences of the same paragraph.
+    """
+    merged_tokens = []
+    merged_pos_ctb = []
+    merged_pos_pku = []
+    merged_named_entities = []
+    start = 0
+    for size in paragraph_sizes:
+        end = start + size
+        offset = 0
+        paragraph_named_entities = []
+        for sentence_tokens, items in zip(tokens[start:end], named_entities[start:end]):
+            for ne in items:
+                paragraph_named_entities.append((ne[0], ne[1], ne[2] + offset, ne[3] + offset))
+            offset += len(sentence_tokens)
+        merged_tokens.append(__sum(tokens[start:end]))
+        merged_pos_ctb.append(__sum(pos_ctb[start:end]))
+        merged_pos_pku.append(__sum(pos_pku[start:end]))
+        merged_named_entities.append(paragraph_named_entities)
+        start = end
+    return merged_tokens, merged_pos_ctb, merged_pos_pku, merged_named_entities
+
+
+def __blank_tags(tokens: List[List[str]]) -> List[List[str]]:
+    return [[''] * len(sentence) for sentence in tokens]
+
+
+def __tag_tokens(need_pos_ctb: bool = True, need_pos_pku: bool = True):
+    """
+    Run the POS taggers and the NER model over the same token batch as a single
+    pipeline stage.
+
+    The three checkpoints are fine-tuned separately, so their ELECTRA encoders
+    have different weights and can't share one forward pass; what they do share
+    is the input, so it's gathered once and each model gets the whole batch.
+    A tagger that is not needed is skipped and its tags are left empty.
+    """
+    def __tag_tokens_fn(tokens: List[List[str]]):
+        order = __length_order(tokens)
+        sorted_tokens = [tokens[i] for i in order]
+        pos_ctb = __unsort(order, __pos_ctb9(sorted_tokens)) if need_pos_ctb else __blank_tags(tokens)
+        pos_pku = __unsort(order, __pos_pku(sorted_tokens)) if need_pos_pku else __blank_tags(tokens)
+        return pos_ctb, pos_pku, __unsort(order, __ner(sorted_tokens))
+    return __tag_tokens_fn
 
 
 # 注意，因为分句会丢失上下文信息，所以可以在一定程度上对分词结果有不好的影响
@@ -189,25 +284,40 @@ def __ner_with_offset(tokens: List[List[str]]):
 #     .append(__sum, input_key=NAMED_ENTITIES, output_key=NAMED_ENTITIES) \
 #     .append(__zip_for_paragraph, input_key=(TOKEN, POS_CTB, POS_PKU),
 #             output_key=TERMS)
-__fine_analysis_paragraph_pipeline = hanlp.pipeline() \
-    .append(split_sentence_with_index, output_key='sentences_with_indices') \
-    .append(__token_with_indices(__tok_fine), input_key='sentences_with_indices', output_key=TOKEN_WITH_SPAN) \
-    .append(__remove_span, input_key=TOKEN_WITH_SPAN, output_key=TOKEN) \
-    .append(__pos_ctb9, input_key=TOKEN, output_key=POS_CTB) \
-    .append(__pos_pku, input_key=TOKEN, output_key=POS_PKU) \
-    .append(__ner_with_offset, input_key=TOKEN, output_key=NAMED_ENTITIES) \
-    .append(__sum, input_key=NAMED_ENTITIES, output_key=NAMED_ENTITIES) \
-    .append(__zip_for_paragraph, input_key=(TOKEN_WITH_SPAN, POS_CTB, POS_PKU),
-            output_key=TERMS)
-
-__fine_analysis_sentence_pipeline = hanlp.pipeline() \
-    .append(__tok_fine, output_key=TOKEN_WITH_SPAN) \
-    .append(__remove_span, input_key=TOKEN_WITH_SPAN, output_key=TOKEN) \
-    .append(__pos_ctb9, input_key=TOKEN, output_key=POS_CTB) \
-    .append(__pos_pku, input_key=TOKEN, output_key=POS_PKU) \
-    .append(__ner, input_key=TOKEN, output_key=NAMED_ENTITIES) \
-    .append(__zip_for_sentence, input_key=(TOKEN_WITH_SPAN, POS_CTB, POS_PKU),
-            output_key=TERMS)
+def __paragraph_pipeline(tok, tag_tokens):
+    return hanlp.pipeline() \
+        .append(__split_paragraphs, output_key=(SENTENCES_WITH_INDICES, PARAGRAPH_SIZES)) \
+        .append(__token_with_indices(tok), input_key=SENTENCES_WITH_INDICES,
+                output_key=(TOKEN_WITH_SPAN, TOKEN)) \
+        .append(tag_tokens, input_key=TOKEN,
+                output_key=(POS_CTB, POS_PKU, NAMED_ENTITIES)) \
+        .append(__merge_paragraphs,
+                input_key=(TOKEN_WITH_SPAN, POS_CTB, POS_PKU, NAMED_ENTITIES, PARAGRAPH_SIZES),
+                output_key=(TOKEN_WITH_SPAN, POS_CTB, POS_PKU, NAMED_ENTITIES))
+
+
+def __sentence_pipeline(tok, tag_tokens):
+    return hanlp.pipeline() \
+        .append(tok, output_key=TOKEN_WITH_SPAN) \
+        .append(__remove_span, input_key=TOKEN_WITH_SPAN, output_key=TOKEN) \
+        .append(tag_tokens, input_key=TOKEN,
+                output_key=(POS_CTB, POS_PKU, NAMED_ENTITIES))
+
+
+def __pipelines(tok) -> dict:
+    """
+    (paragraph pipeline, sentence pipeline) for every combination of needed
+    POS taggers, keyed by (need_pos_ctb, need_pos_pku)
+    """
+    res = {}
+    for need_pos_ctb, need_pos_pku in ((True, True), (True, False), (False, True)):
+        tag_tokens = __tag_tokens(need_pos_ctb, need_pos_pku)
+        res[(need_pos_ctb, need_pos_pku)] = (
+            __paragraph_pipeline(tok, tag_tokens),
+            __sentence_pipeline(tok, tag_tokens),
+        )
+    return res
+
 
 # __fine_analysis_pipeline_with_span = hanlp.pipeline() \
 #     .append(hanlp.utils.rules.split_sentence, output_key='sentences') \
@@ -220,25 +330,11 @@ __fine_analysis_sentence_pipeline = hanlp.pipeline() \
 #     .append(__zip_for_paragraph, input_key=(TOKEN_WITH_SPAN, POS_CTB, POS_PKU),
 #             output_key=TERMS)
 
-__coarse_analysis_paragraph_pipeline = hanlp.pipeline() \
-    .append(split_sentence_with_index, output_key='sentences_with_indices') \
-    .append(__token_with_indices(__tok_coarse), input_key='sentences_with_indices', output_key=TOKEN_WITH_SPAN) \
-    .append(__remove_span, input_key=TOKEN_WITH_SPAN, output_key=TOKEN) \
-    .append(__pos_ctb9, input_key=TOKEN, output_key=POS_CTB) \
-    .append(__pos_pku, input_key=TOKEN, output_key=POS_PKU) \
-    .append(__ner_with_offset, input_key=TOKEN, output_key=NAMED_ENTITIES) \
-    .append(__sum, input_key=NAMED_ENTITIES, output_key=NAMED_ENTITIES) \
-    .append(__zip_for_paragraph, input_key=(TOKEN_WITH_SPAN, POS_CTB, POS_PKU),
-            output_key=TERMS)
-
-__coarse_analysis_sentence_pipeline = hanlp.pipeline() \
-    .append(__tok_coarse, output_key=TOKEN_WITH_SPAN) \
-    .append(__remove_span, input_key=TOKEN_WITH_SPAN, output_key=TOKEN) \
-    .append(__pos_ctb9, input_key=TOKEN, output_key=POS_CTB) \
-    .append(__pos_pku, input_key=TOKEN, output_key=POS_PKU) \
-    .append(__ner, input_key=TOKEN, output_key=NAMED_ENTITIES) \
-    .append(__zip_for_sentence, input_key=(TOKEN_WITH_SPAN, POS_CTB, POS_PKU),
-            output_key=TERMS)
+__fine_analysis_pipelines = __pipelines(__tok_fine)
+__coarse_analysis_pipelines = __pipelines(__tok_coarse)
+
+__fine_result_cache = ResultCache()
+__coarse_result_cache = ResultCache()
 
 
 def _filter_named_entities(
@@ -259,9 +355,12 @@ def _process_sentences(
         allow_pos_pku: Optional[Set[str]] = None,
 ) -> List[AnalysisResponse]:
     res = []
-    for terms, named_entities in zip(docs[TERMS], docs[NAMED_ENTITIES]):
+    for tokens, pos_ctb, pos_pku, named_entities in zip(
+            docs[TOKEN_WITH_SPAN], docs[POS_CTB], docs[POS_PKU], docs[NAMED_ENTITIES]):
         tmp1 = {
-            TERMS: terms,
+            TOKEN_WITH_SPAN: tokens,
+            POS_CTB: pos_ctb,
+            POS_PKU: pos_pku,
             NAMED_ENTITIES: named_entities
         }
         tmp2 = _process_paragraph(
@@ -273,6 +372,15 @@ def _process_sentences(
     return res
 
 
+def _entity_span(tokens: List[List[Any]], start: int, end: int) -> Tuple[int, int]:
+    """
+    Character span of the entity covering tokens[start:end]
+    """
+    # here we minus 1,
+    # because the end offset returned by hanlp is exclusive
+    return tokens[start][1], tokens[end - 1][2]
+
+
 def _process_paragraph(
         docs: dict,
         allow_pos_ctb: Optional[Set[str]] = None,
@@ -281,34 +389,40 @@ def _process_paragraph(
     """
     处理分析结果，提取terms和named entities
     """
-    terms = docs[TERMS]
-    term_response = _filter_terms(
-        terms,
+    # tokens and tags stay in parallel lists; only the terms that pass the
+    # filters are turned into Term objects
+    tokens, pos_ctb, pos_pku = docs[TOKEN_WITH_SPAN], docs[POS_CTB], docs[POS_PKU]
+    keep = _filter_term_indices(
+        pos_ctb,
+        pos_pku,
         allow_pos_ctb=allow_pos_ctb,
         allow_pos_pku=allow_pos_pku
     )
+    term_response = [
+        Term(
+            token=tokens[i][0],
+            pos_ctb=pos_ctb[i],
+            pos_pku=pos_pku[i],
+            span=(tokens[i][1], tokens[i][2])
+        )
+        for i in keep
+    ]
 
     # named_entities = _filter_named_entities(docs[NAMED_ENTITIES])
     named_entities = docs[NAMED_ENTITIES]
-    ne_response = []
-    for ne in named_entities:
-        start = terms[ne[2]].span and terms[ne[2]].span[0]
-        # terms[ne[3] - 1]
-        # here we minus 1,
-        # because somehow offset returned by hanlp has 1 offset
-        end = terms[ne[3]].span and terms[ne[3] - 1].span[1]
-        span = None
-        if start is not None and end is not None:
-            span = start, end
-        item = NamedEntity(
+    ne_response = [
+        NamedEntity(
             entity=ne[0],
             type=ne[1],
-            offset=ne[2:4],
-            span=span
+            offset=(ne[2], ne[3]),
+            span=_entity_span(tokens, ne[2], ne[3])
         )
-        ne_response.append(item)
+        for ne in named_entities
+    ]
 
-    return AnalysisResponse(
+    # terms and entities are built above from model output, so the response
+    # is constructed without running pydantic validation over them again
+    return AnalysisResponse.model_construct(
         terms=term_response,
         named_entities=ne_response
     )
@@ -322,10 +436,25 @@ def _should_use_paragraph_pipeline(text: str) -> bool:
     return len(text) > TEXT_LENGTH_THRESHOLD
 
 
+def _needed_taggers(
+        allow_pos_ctb: Optional[Set[str]] = None,
+        allow_pos_pku: Optional[Set[str]] = None,
+) -> Tuple[bool, bool]:
+    """
+    When only one of the filters is given, the other POS tagger is not run and
+    its tags are left empty in the response
+    """
+    if allow_pos_ctb and not allow_pos_pku:
+        return True, False
+    if allow_pos_pku and not allow_pos_ctb:
+        return False, True
+    return True, True
+
+
 def _analysis_batch(
         texts: List[str],
-        paragraph_pipeline,
-        sentence_pipeline,
+        pipelines: dict,
+        cache: ResultCache,
         allow_pos_ctb: Optional[Set[str]] = None,
         allow_pos_pku: Optional[Set[str]] = None,
 ) -> List[AnalysisResponse]:
@@ -334,29 +463,57 @@ def _analysis_batch(
 
     Args:
         texts: List of input texts to analyze
-        paragraph_pipeline: Pipeline to use for long texts
-        sentence_pipeline: Pipeline to use for short texts
+        pipelines: (paragraph pipeline, sentence pipeline) pairs keyed by the
+            POS taggers they run, see _needed_taggers
+        cache: Results of earlier calls, keyed by text and filters
         allow_pos_ctb: Optional set of allowed CTB POS tags to filter
         allow_pos_pku: Optional set of allowed PKU POS tags to filter
 
     Returns:
         List of AnalysisResponse objects in the same order as input texts
     """
-    # Split texts based on length threshold
-    long_texts = [text for text in texts if len(text.strip()) and _should_use_paragraph_pipeline(text)]
-    short_texts = [text for text in texts if len(text.strip()) and not _should_use_paragraph_pipeline(text)]
-
+    allow_pos_ctb = _normalize_tags(allow_pos_ctb)
+    allow_pos_pku = _normalize_tags(allow_pos_pku)
+    # Long texts go through the paragraph pipeline, short ones through the
+    # sentence pipeline
+    paragraph_pipeline, sentence_pipeline = pipelines[_needed_taggers(allow_pos_ctb, allow_pos_pku)]
+
+    # Split texts based on length threshold, in a single pass; blank texts are
+    # skipped (isspace is the same test as strip() leaving nothing, without
+    # copying the text)
+    # Results are keyed by text, so a repeated text only needs to be analysed
+    # once
     analysis_results = {}
-
-    # Process longer texts individually using paragraph pipeline
-    for text in long_texts:
-        pipeline_output = paragraph_pipeline(text)
-        analysis_result = _process_paragraph(
+    long_texts = {}
+    short_texts = {}
+    for text in texts:
+        if not text or text.isspace() or text in analysis_results:
+            continue
+        cached = cache.get((text, allow_pos_ctb, allow_pos_pku))
+        if cached is not None:
+            analysis_results[text] = cached
+            continue
+        if _should_use_paragraph_pipeline(text):
+            long_texts[text] = None
+        else:
+            short_texts[text] = None
+    long_texts = list(long_texts)
+    # Short texts are sorted by length, so the fixed-size batches the models
+    # cut them into hold texts of similar length and pad little
+    short_texts = sorted(short_texts, key=len)
+
+    # Process longer texts using paragraph pipeline; their sentences are
+    # tokenized and tagged together in one batch
+    if long_texts:
+        pipeline_output = paragraph_pipeline(long_texts)
+        batch_results = _process_sentences(
             pipeline_output,
             allow_pos_ctb=allow_pos_ctb,
             allow_pos_pku=allow_pos_pku
         )
-        analysis_results[text] = analysis_result
+        for text, result in zip(long_texts, batch_results):
+            analysis_results[text] = result
+            cache.put((text, allow_pos_ctb, allow_pos_pku), result)
 
     # Process shorter texts in batch using sentence pipeline
     if short_texts:
@@ -369,14 +526,10 @@ def _analysis_batch(
         # Map results back to their original texts
         for text, result in zip(short_texts, batch_results):
             analysis_results[text] = result
-
-    empty_result = AnalysisResponse(
-        terms=[],
-        named_entities=[]
-    )
+            cache.put((text, allow_pos_ctb, allow_pos_pku), result)
 
     # Preserve original text order in output
-    return [analysis_results.get(text, empty_result) for text in texts]
+    return [analysis_results.get(text, _EMPTY_RESPONSE) for text in texts]
 
 
 def fine_analysis_batch(
@@ -386,8 +539,8 @@ def fine_analysis_batch(
 ) -> List[AnalysisResponse]:
     return _analysis_batch(
         texts,
-        __fine_analysis_paragraph_pipeline,
-        __fine_analysis_sentence_pipeline,
+        __fine_analysis_pipelines,
+        __fine_result_cache,
         allow_pos_ctb,
         allow_pos_pku
     )
@@ -400,8 +553,8 @@ def coarse_analysis_batch(
 ) -> List[AnalysisResponse]:
     return _analysis_batch(
         texts,
-        __coarse_analysis_paragraph_pipeline,
-        __coarse_analysis_sentence_pipeline,
+        __coarse_analysis_pipelines,
+        __coarse_result_cache,
         allow_pos_ctb,
         allow_pos_pku
     )
@@ -415,11 +568,15 @@ def fine_coarse_analysis_batch(
     """
     Batch process multiple texts using both fine and coarse-grained tokenization
     """
-    fine_results = fine_analysis_batch(texts, allow_pos_ctb, allow_pos_pku)
+    # fine and coarse share no intermediate results, so fine runs on the
+    # executor while coarse runs on the calling thread
+    fine_future = _executor.submit(fine_analysis_batch, texts, allow_pos_ctb, allow_pos_pku)
     coarse_results = coarse_analysis_batch(texts, allow_pos_ctb, allow_pos_pku)
+    fine_results = fine_future.result()
 
+    # both halves are already built responses, so they aren't validated again
     return [
-        FineCoarseAnalysisResponse(fine=fine, coarse=coarse)
+        FineCoarseAnalysisResponse.model_construct(fine=fine, coarse=coarse)
         for fine, coarse in zip(fine_results, coarse_results)
     ]
 
@@ -429,6 +586,8 @@ def fine_analysis(
         allow_pos_ctb: Optional[Set[str]] = None,
         allow_pos_pku: Optional[Set[str]] = None,
 ) -> AnalysisResponse:
+    if not text or text.isspace():
+        return _EMPTY_RESPONSE
     results = fine_analysis_batch([text], allow_pos_ctb, allow_pos_pku)
     return results[0]
 
@@ -438,6 +597,8 @@ def coarse_analysis(
         allow_pos_ctb: Optional[Set[str]] = None,
         allow_pos_pku: Optional[Set[str]] = None,
 ) -> AnalysisResponse:
+    if not text or text.isspace():
+        return _EMPTY_RESPONSE
     results = coarse_analysis_batch([text], allow_pos_ctb, allow_pos_pku)
     return results[0]
 
@@ -1,13 +1,19 @@
-from typing import List, Tuple, Optional, Set
+from dataclasses import dataclass
+from typing import List, Tuple, Optional, FrozenSet
 
 from pydantic import BaseModel
 
 
-class Term(BaseModel):
+# Term and NamedEntity are created once per token / entity on every request,
+# so they are plain slotted dataclasses rather than pydantic models:
+# construction skips validation and instances are smaller.
+# pydantic still validates and serializes them as fields of the responses.
+@dataclass(slots=True)
+class Term:
     token: str
     pos_ctb: str
     pos_pku: str
-    span: Tuple[int, int] | None
+    span: Tuple[int, int] | None = None
 
 
 class AnalysisReq(BaseModel):
@@ -20,8 +26,9 @@ class AnalysisReq(BaseModel):
     # https://hanlp.hankcs.com/docs/annotations/pos/ctb.html
     """
     text: str
-    allow_pos_ctb: Optional[Set[str]] = None
-    allow_pos_pku: Optional[Set[str]] = None
+    # parsed straight into frozensets, which the analysis functions filter with
+    allow_pos_ctb: Optional[FrozenSet[str]] = None
+    allow_pos_pku: Optional[FrozenSet[str]] = None
 
 
 class BatchAnalysisReq(BaseModel):
@@ -29,15 +36,16 @@ class BatchAnalysisReq(BaseModel):
     Batch version of AnalysisReq for processing multiple texts at once
     """
     texts: List[str]
-    allow_pos_ctb: Optional[Set[str]] = None
-    allow_pos_pku: Optional[Set[str]] = None
+    allow_pos_ctb: Optional[FrozenSet[str]] = None
+    allow_pos_pku: Optional[FrozenSet[str]] = None
 
 
-class NamedEntity(BaseModel):
+@dataclass(slots=True)
+class NamedEntity:
     entity: str
     type: str
     offset: Tuple[int, int]
-    span: Tuple[int, int] | None
+    span: Tuple[int, int] | None = None
 
 
 class AnalysisResponse(BaseModel):
@@ -1,8 +1,9 @@
 import unittest
 
+from src.analysis.models import Term
 from src.analysis.analysis import _filter_terms, _filter_named_entities, \
     fine_analysis_batch, coarse_analysis_batch, fine_coarse_analysis_batch, \
-    _should_use_paragraph_pipeline, TEXT_LENGTH_THRESHOLD, has_gpu, fine_analysis, \
+    _should_use_paragraph_pipeline, _needed_taggers, TEXT_LENGTH_THRESHOLD, has_gpu, fine_analysis, \
     coarse_analysis, fine_coarse_analysis
 
 
@@ -34,6 +35,23 @@ class TestAnalysis(unittest.TestCase):
         result = _filter_terms([])
         self.assertEqual(result, [])
 
+    def test_filter_terms_both_filters(self):
+        # Both filters apply together, not just the last one given
+        terms = [
+            Term(token="支付宝", pos_ctb="NN", pos_pku="n", span=(0, 3)),
+            Term(token="英伟达", pos_ctb="NR", pos_pku="nt", span=(3, 6)),
+            Term(token="支付", pos_ctb="VV", pos_pku="n", span=(6, 8)),
+        ]
+        result = _filter_terms(terms, allow_pos_ctb={"NN", "NR"}, allow_pos_pku={"n"})
+        self.assertEqual([term.token for term in result], ["支付宝"])
+
+    def test_needed_taggers(self):
+        # A tagger is skipped only when the other one is the only filter given
+        self.assertEqual(_needed_taggers(), (True, True))
+        self.assertEqual(_needed_taggers({"NN"}, {"n"}), (True, True))
+        self.assertEqual(_needed_taggers({"NN"}, None), (True, False))
+        self.assertEqual(_needed_taggers(set(), {"n"}), (False, True))
+
     def test_fine_analysis(self):
         """
         测试细粒度分词分析
@@ -0,0 +1,31 @@
+import unittest
+
+from src.analysis._result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = ResultCache(maxsize=2)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ResultCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        # touching "a" makes "b" the least recently used entry
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_disabled(self):
+        cache = ResultCache(maxsize=0)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Micro-batching of concurrent single-text requests.
+
+Requests that arrive within a few milliseconds of each other are collected and
+analysed with one call of a batch function, so the models run one dense batch
+instead of one forward pass per request.
+"""
+import asyncio
+import logging
+from typing import Callable, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_Filters = Tuple[Optional[FrozenSet[str]], Optional[FrozenSet[str]]]
+
+
+class BatchScheduler:
+    """
+    Queue single texts and analyse them in batches with `batch_fn`, which takes
+    (texts, allow_pos_ctb, allow_pos_pku) and returns one result per text.
+
+    A batch is flushed when it holds `max_batch` texts, or `max_wait_ms` after
+    its first text arrived. The batch function runs in a worker thread. When a
+    batch fails, its texts are retried one by one, so only the requests whose
+    own text fails get the error.
+    """
+
+    def __init__(self, batch_fn: Callable, max_batch: int = 32, max_wait_ms: float = 10):
+        self._batch_fn = batch_fn
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(
+            self,
+            text: str,
+            allow_pos_ctb: Optional[FrozenSet[str]] = None,
+            allow_pos_pku: Optional[FrozenSet[str]] = None,
+    ):
+        """
+        Queue a text and wait for its result. The filters are frozensets, as
+        the request models parse them, and are used as they are to group the
+        texts; an empty filter is the same as none.
+        """
+        # started on first use, so it runs on the event loop serving requests
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, (allow_pos_ctb or None, allow_pos_pku or None), future))
+        return await future
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._max_wait
+        while len(batch) < self._max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # texts are only batched with texts that use the same filters
+            groups = {}
+            for text, filters, future in batch:
+                groups.setdefault(filters, []).append((text, future))
+            for filters, items in groups.items():
+                await self._flush(filters, items)
+
+    async def _flush(self, filters: _Filters, items: List[tuple]):
+        # Errors are caught here rather than in _run, so they never stop the
+        # scheduler, and the tracebacks handed to the requests don't hold on
+        # to the frame of the long-running _run task
+        try:
+            await self._analyse(filters, items)
+        except Exception as e:
+            logger.exception("Flushing a batch of %d texts failed", len(items))
+            for _, future in items:
+                self._resolve(future, exception=e)
+
+    async def _analyse(self, filters: _Filters, items: List[tuple]):
+        texts = [text for text, _ in items]
+        try:
+            results = await asyncio.to_thread(self._batch_fn, texts, *filters)
+        except Exception as e:
+            if len(items) == 1:
+                logger.exception("Analysing a text failed")
+                self._resolve(items[0][1], exception=e)
+                return
+            # one bad text (or one too long for the GPU) fails the whole
+            # batch, so every text is retried alone and only the texts that
+            # fail by themselves get the error
+            logger.warning("Batch of %d texts failed, retrying them one by one", len(texts),
+                           exc_info=True)
+            for item in items:
+                await self._flush(filters, [item])
+            return
+        for (_, future), result in zip(items, results):
+            self._resolve(future, result=result)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result=None, exception: Optional[BaseException] = None):
+        # the request may have been cancelled while the batch ran
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
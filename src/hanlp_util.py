@@ -1,7 +1,10 @@
 from typing import List, Union
-from xml.dom.minidom import Document
 
 import hanlp
+from hanlp_common.document import Document
+
+from src.analysis._model_cache import LazyProxy, get as get_model
+from src.split_sentence import split_sentence
 
 WORD = "word"
 POS_CTB9 = "pos_ctb9"
@@ -9,21 +12,43 @@ POS_PKU = "pos_pku"
 NAMED_ENTITIES = "named_entities"
 TERMS = "terms"
 
-__tok_fine = hanlp.load(hanlp.pretrained.tok.FINE_ELECTRA_SMALL_ZH)
+__MODEL_NAMES = (
+    hanlp.pretrained.tok.FINE_ELECTRA_SMALL_ZH,
+    hanlp.pretrained.ner.MSRA_NER_ELECTRA_SMALL_ZH,
+    hanlp.pretrained.pos.CTB9_POS_ELECTRA_SMALL,
+    hanlp.pretrained.pos.PKU_POS_ELECTRA_SMALL,
+)
+
+
+def __load_tok_fine():
+    model = get_model(hanlp.pretrained.tok.FINE_ELECTRA_SMALL_ZH)
+    # src.analysis turns on output_spans for the shared tokenizer; turn it on
+    # here too, so the output doesn't depend on import order, and strip the spans
+    model.config.output_spans = True
+    return model
+
+
+# The models come from the same process-wide cache as src.analysis, so the
+# checkpoints are loaded only once even when both modules are imported, and
+# only when a pipeline first runs
+__tok_fine_model = LazyProxy(__load_tok_fine)
 # __tok_coarse = hanlp.load(hanlp.pretrained.tok.COARSE_ELECTRA_SMALL_ZH)
 
-__ner = hanlp.load(hanlp.pretrained.ner.MSRA_NER_ELECTRA_SMALL_ZH)
-__pos_ctb9 = hanlp.load(hanlp.pretrained.pos.CTB9_POS_ELECTRA_SMALL)
-__pos_pku = hanlp.load(hanlp.pretrained.pos.PKU_POS_ELECTRA_SMALL)
+__ner = LazyProxy(lambda: get_model(hanlp.pretrained.ner.MSRA_NER_ELECTRA_SMALL_ZH))
+__pos_ctb9 = LazyProxy(lambda: get_model(hanlp.pretrained.pos.CTB9_POS_ELECTRA_SMALL))
+__pos_pku = LazyProxy(lambda: get_model(hanlp.pretrained.pos.PKU_POS_ELECTRA_SMALL))
 
-# .append(__tok_coarse, output_key="tok/coarse") \
-_text_pipeline = hanlp.pipeline() \
-    .append(hanlp.utils.rules.split_sentence) \
-    .append(__tok_fine, output_key="tok/fine") \
-    .append(__pos_ctb9, input_key="tok/fine", output_key="pos/ctb") \
-    .append(__pos_pku, input_key="tok/fine", output_key='pos/pku') \
-    .append(__ner, input_key="tok/fine", output_key="ner/msra")
 
+def __tok_fine(sentences):
+    return [[item[0] for item in items] for items in __tok_fine_model(sentences)]
+
+
+def _preload():
+    for name in __MODEL_NAMES:
+        get_model(name)
+
+
+# .append(__tok_coarse, output_key="tok/coarse") \
 _sentences_pipeline = hanlp.pipeline() \
     .append(__tok_fine, output_key="tok/fine") \
     .append(__pos_ctb9, input_key="tok/fine", output_key="pos/ctb") \
@@ -31,10 +56,26 @@ _sentences_pipeline = hanlp.pipeline() \
     .append(__ner, input_key="tok/fine", output_key="ner/msra")
 
 
+def _text_pipeline(text: str):
+    # raw text is split into sentences first, then shares the sentences pipeline
+    return _sentences_pipeline(list(split_sentence(text)))
+
+
 class HanLPUtil:
-    def __init__(self):
+    def __init__(self, preload: bool = False):
+        """
+        Models are loaded on the first parse, or right away with preload=True
+        """
+        if preload:
+            _preload()
         self.text_pipeline = _text_pipeline
         self.sentences_pipeline = _sentences_pipeline
+        # raw text goes through the text pipeline that includes sentence
+        # splitting, a list of sentences through the sentences pipeline
+        self._dispatch = {
+            str: self.text_pipeline,
+            list: self.sentences_pipeline,
+        }
         # self.hanlp = hanlp.load(
         #     hanlp.pretrained.mtl.CLOSE_TOK_POS_NER_SRL_DEP_SDP_CON_ELECTRA_SMALL_ZH
         # )
@@ -43,14 +84,10 @@ class HanLPUtil:
             self,
             text: Union[str, List[str]] = None,
     ) -> Document:
-        if isinstance(text, str):
-            # For raw text input, use text pipeline that includes sentence splitting
-            res = self.text_pipeline(text)
-        elif isinstance(text, list):
-            # For list of sentences, use sentences pipeline without sentence splitting
-            res = self.sentences_pipeline(text)
-        else:
+        pipeline = self._dispatch.get(type(text))
+        if pipeline is None:
             raise ValueError("Text must be either a string or list of strings")
+        res = pipeline(text)
         # res = self.hanlp(
         #     text,
         #     tokens=tokens,
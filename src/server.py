@@ -1,24 +1,49 @@
 import argparse
+from contextlib import asynccontextmanager
 from typing import List, Union
 from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
 import uvicorn
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Response
 from pydantic import BaseModel
 
-from .analysis.analysis import fine_analysis, coarse_analysis, fine_coarse_analysis, fine_analysis_batch, coarse_analysis_batch, fine_coarse_analysis_batch
+from .analysis.analysis import fine_analysis_batch, coarse_analysis_batch, fine_coarse_analysis_batch
 from .analysis.models import AnalysisReq, AnalysisResponse, \
     FineCoarseAnalysisResponse, BatchAnalysisReq, BatchAnalysisResponse, \
     BatchFineCoarseAnalysisResponse
+from .batch_scheduler import BatchScheduler
 
-app = FastAPI(title="HanLP Server")
+# Concurrent single-text requests are analysed together in micro-batches
+_fine_scheduler = BatchScheduler(fine_analysis_batch)
+_coarse_scheduler = BatchScheduler(coarse_analysis_batch)
+_fine_coarse_scheduler = BatchScheduler(fine_coarse_analysis_batch)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    for scheduler in (_fine_scheduler, _coarse_scheduler, _fine_coarse_scheduler):
+        await scheduler.stop()
+
+
+app = FastAPI(title="HanLP Server", lifespan=lifespan)
 router = APIRouter(prefix="/hanlp")
 
 
 # nlp = HanLPUtil()
 
 
+def _json_response(model: BaseModel) -> Response:
+    """
+    Serialize a response model with pydantic's own JSON encoder. Returning a
+    Response skips FastAPI's revalidation and jsonable_encoder pass over the
+    (possibly thousands of) terms; the route's response_model still documents
+    the schema.
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
 @router.get("/health")
 def health_check():
     return {"status": "ok"}
@@ -34,20 +59,21 @@ class TextRequest(BaseModel):
 #     return res
 
 
-@router.post("/analysis/fine")
-def analyze_fine(request: AnalysisReq) -> AnalysisResponse:
+@router.post("/analysis/fine", response_model=AnalysisResponse)
+async def analyze_fine(request: AnalysisReq) -> Response:
     """
     使用细粒度分词进行分析
     """
-    return fine_analysis(
+    result = await _fine_scheduler.submit(
         text=request.text,
         allow_pos_ctb=request.allow_pos_ctb,
         allow_pos_pku=request.allow_pos_pku
     )
+    return _json_response(result)
 
 
-@router.post("/analysis/fine/batch")
-def analyze_fine_batch(request: BatchAnalysisReq) -> BatchAnalysisResponse:
+@router.post("/analysis/fine/batch", response_model=BatchAnalysisResponse)
+def analyze_fine_batch(request: BatchAnalysisReq) -> Response:
     """
     Use fine-grained tokenization for batch analysis
     """
@@ -56,23 +82,24 @@ def analyze_fine_batch(request: BatchAnalysisReq) -> BatchAnalysisResponse:
         allow_pos_ctb=request.allow_pos_ctb,
         allow_pos_pku=request.allow_pos_pku
     )
-    return BatchAnalysisResponse(results=results)
+    return _json_response(BatchAnalysisResponse.model_construct(results=results))
 
 
-@router.post("/analysis/coarse")
-def analyze_coarse(request: AnalysisReq) -> AnalysisResponse:
+@router.post("/analysis/coarse", response_model=AnalysisResponse)
+async def analyze_coarse(request: AnalysisReq) -> Response:
     """
     使用粗粒度分词进行分析
     """
-    return coarse_analysis(
+    result = await _coarse_scheduler.submit(
         text=request.text,
         allow_pos_ctb=request.allow_pos_ctb,
         allow_pos_pku=request.allow_pos_pku
     )
+    return _json_response(result)
 
 
-@router.post("/analysis/coarse/batch")
-def analyze_coarse_batch(request: BatchAnalysisReq) -> BatchAnalysisResponse:
+@router.post("/analysis/coarse/batch", response_model=BatchAnalysisResponse)
+def analyze_coarse_batch(request: BatchAnalysisReq) -> Response:
     """
     Use coarse-grained tokenization for batch analysis
     """
@@ -81,23 +108,24 @@ def analyze_coarse_batch(request: BatchAnalysisReq) -> BatchAnalysisResponse:
         allow_pos_ctb=request.allow_pos_ctb,
         allow_pos_pku=request.allow_pos_pku
     )
-    return BatchAnalysisResponse(results=results)
+    return _json_response(BatchAnalysisResponse.model_construct(results=results))
 
 
-@router.post("/analysis/fine-coarse")
-def analyze_fine_coarse(request: AnalysisReq) -> FineCoarseAnalysisResponse:
+@router.post("/analysis/fine-coarse", response_model=FineCoarseAnalysisResponse)
+async def analyze_fine_coarse(request: AnalysisReq) -> Response:
     """
     同时进行细粒度和粗粒度分词分析
     """
-    return fine_coarse_analysis(
+    result = await _fine_coarse_scheduler.submit(
         text=request.text,
         allow_pos_ctb=request.allow_pos_ctb,
         allow_pos_pku=request.allow_pos_pku
     )
+    return _json_response(result)
 
 
-@router.post("/analysis/fine-coarse/batch")
-def analyze_fine_coarse_batch(request: BatchAnalysisReq) -> BatchFineCoarseAnalysisResponse:
+@router.post("/analysis/fine-coarse/batch", response_model=BatchFineCoarseAnalysisResponse)
+def analyze_fine_coarse_batch(request: BatchAnalysisReq) -> Response:
     """
     Use both fine and coarse-grained tokenization for batch analysis
     """
@@ -106,7 +134,7 @@ def analyze_fine_coarse_batch(request: BatchAnalysisReq) -> BatchFineCoarseAnaly
         allow_pos_ctb=request.allow_pos_ctb,
         allow_pos_pku=request.allow_pos_pku
     )
-    return BatchFineCoarseAnalysisResponse(results=results)
+    return _json_response(BatchFineCoarseAnalysisResponse.model_construct(results=results))
 
 
 def parse_args():
@@ -42,6 +42,45 @@ _UNDO_AB_SENIOR = re.compile(r'([A-Z][a-z]{1,2}\.)' + _SEPARATOR + r'(\w)', re.U
 # Used to restore spaces after processing acronyms
 _UNDO_AB_ACRONYM = re.compile(r'(\.[a-zA-Z]\.)' + _SEPARATOR + r'(\w)', re.UNICODE)
 
+# Abbreviation rules and their undo rules, applied in this order
+_AB_REGEXES = (_AB_SENIOR, _AB_ACRONYM)
+_UNDO_AB_REGEXES = (_UNDO_AB_SENIOR, _UNDO_AB_ACRONYM)
+
+# Replacement templates for the separators used by split_sentence
+_REPLACEMENTS = {separator: r"\1" + separator + r"\2" for separator in (_SEPARATOR, r" ")}
+
+# Chinese punctuation rules shared by split_sentence and split_sentence_with_index.
+# A split point is inserted after:
+#   1. Chinese sentence endings (。！？) when not followed by quotes
+#   2. Multiple dots (......) when not followed by quotes
+#   3. Chinese ellipsis (……) when not followed by quotes
+#   4. Chinese punctuation + quotes when not followed by more punctuation
+# Originally these were four patterns, ([。！？?])([^”’]), (\.{6})([^”’]),
+# (…{2})([^”’]) and ([。！？?][”’])([^，。！？?]), applied one after another.
+# They are fused into one pattern that finds the same split points in a single
+# scan. It starts with a single character class, so re can skip ahead to the
+# next candidate character instead of trying every rule at every position; the
+# lookbehind then picks the rule. Every rule matches its head (group 1 plus an
+# odd group) and the following character (even group). That character is only
+# consumed when the same rule could start there, as it would have been consumed
+# by the rule's own scan; when another rule could start at it, it is only
+# looked ahead at, so that rule still matches there. The split point is the
+# start of the even group.
+_RE_CN_SPLIT = re.compile(
+    r'([。！？?.…])(?:'
+    r'(?<=[。！？?])(?:([。！？?](?![”’])|(?=[^”’]))|([”’])([^，。！？?.…]|(?=[.…])))'
+    r'|(?<=\.)(\.{5})(\.|(?=[^”’]))'
+    r'|(?<=…)(…)(…|(?=[^”’]))'
+    r')'
+)
+
+# Characters _RE_SENTENCE can end a sentence at. A chunk without them is a
+# single sentence, e.g. Chinese text that was already split at 。！？
+_RE_SENTENCE_BREAK = re.compile(r'[.!?\n]')
+
+# First non-whitespace character, used to trim the start of a chunk in place
+_RE_NON_SPACE = re.compile(r'\S')
+
 
 def _replace_with_separator(text, separator, regexs):
     """
@@ -53,13 +92,13 @@ def _replace_with_separator(text, separator, regexs):
     Args:
         text (str): Input text to process
         separator (str): Character to use as separator
-        regexs (list): List of compiled regex patterns to apply
+        regexs (Iterable): Compiled regex patterns to apply
 
     Returns:
         str: Text with separators inserted at regex match boundaries
     """
     # Replacement pattern: keep group 1, add separator, keep group 2
-    replacement = r"\1" + separator + r"\2"
+    replacement = _REPLACEMENTS.get(separator) or r"\1" + separator + r"\2"
     result = text
 
     # Apply each regex pattern sequentially
@@ -68,6 +107,58 @@ def _replace_with_separator(text, separator, regexs):
 
     return result
 
+
+def _protect_abbreviations(text):
+    """
+    Replace the space after abbreviations and acronyms with the separator, so
+    _RE_SENTENCE doesn't split there
+    """
+    # both rules need a period, which most chunks (e.g. all Chinese text) lack
+    if '.' not in text:
+        return text
+    return _replace_with_separator(text, _SEPARATOR, _AB_REGEXES)
+
+
+def _restore_abbreviations(sentence, inserted_only=False):
+    """
+    Undo _protect_abbreviations on a sentence found in the protected text.
+    inserted_only tells that the text had no separators of its own, so every
+    separator in the sentence was inserted by _protect_abbreviations.
+    """
+    # nothing to undo without a separator
+    if _SEPARATOR not in sentence:
+        return sentence
+    if inserted_only:
+        # the undo rules match exactly the separators the rules inserted
+        return sentence.replace(_SEPARATOR, r" ")
+    return _replace_with_separator(sentence, r" ", _UNDO_AB_REGEXES)
+
+
+def _iter_chunks(text) -> Iterator[Tuple[str, int]]:
+    """
+    Split text at the Chinese punctuation split points (see _RE_CN_SPLIT) and
+    yield each non-blank chunk with its leading whitespace removed, together
+    with its start index in text. Chunks may still contain newlines.
+    """
+    prev = 0
+    # The following-character group is always the last group that matched, and
+    # the split goes before it. Matches don't overlap, so the split points come
+    # out sorted and unique.
+    for m in _RE_CN_SPLIT.finditer(text):
+        split_point = m.start(m.lastindex)
+        # Trim without copying the chunk before it is trimmed
+        first = _RE_NON_SPACE.search(text, prev, split_point)
+        if first:
+            start = first.start()
+            yield text[start:split_point], start
+        prev = split_point
+    # the tail chunk ends at the end of the text
+    first = _RE_NON_SPACE.search(text, prev)
+    if first:
+        start = first.start()
+        yield text[start:], start
+
+
 def split_sentence_with_index(text, best=True) -> Iterator[Tuple[str, int]]:
     """
     Like split_sentence, but also yields the starting character index of each
@@ -77,66 +168,23 @@ def split_sentence_with_index(text, best=True) -> Iterator[Tuple[str, int]]:
     original text (after the same leading/trailing whitespace trimming that
     split_sentence performs for each chunk/sentence).
     """
-    if not text:
-        return
-
-    # Find all split insertion points according to the same Chinese punctuation
-    # preprocessing rules used in split_sentence. Each match inserts a split
-    # after group 1, so the split position is match.end(1).
-    split_points = []
-    for regex in (
-        re.compile(r'([。！？?])([^”’])'),
-        re.compile(r'(\.{6})([^”’])'),
-        re.compile(r'(…{2})([^”’])'),
-        re.compile(r'([。！？?][”’])([^，。！？?])'),
-    ):
-        for m in regex.finditer(text):
-            split_points.append(m.end(1))
-
-    # Sort and unique the split points
-    split_points = sorted(set(split_points))
-
-    # Build chunks identical to the newline-based preprocessing
-    prev = 0
-    segments = []  # list of (chunk_text, chunk_start_index_in_original)
-    for sp in split_points:
-        if sp <= prev:
-            continue
-        chunk = text[prev:sp]
-        # Trim like split_sentence does per chunk
-        lstripped = chunk.lstrip()
-        if lstripped:
-            leading_ws = len(chunk) - len(lstripped)
-            segments.append((lstripped, prev + leading_ws))
-        prev = sp
-    # Tail segment
-    if prev < len(text):
-        chunk = text[prev:]
-        lstripped = chunk.lstrip()
-        if lstripped:
-            leading_ws = len(chunk) - len(lstripped)
-            segments.append((lstripped, prev + leading_ws))
-
-    # If no segments detected (e.g., empty after strip), return nothing
-    if not segments:
-        return
-
-    for chunk_text, base_index in segments:
+    for chunk_text, base_index in _iter_chunks(text):
         if not best:
             yield (chunk_text, base_index)
             continue
 
-        processed = _replace_with_separator(
-            chunk_text, _SEPARATOR, [_AB_SENIOR, _AB_ACRONYM]
-        )
+        if not _RE_SENTENCE_BREAK.search(chunk_text):
+            yield (chunk_text, base_index)
+            continue
+
+        inserted_only = _SEPARATOR not in chunk_text
+        processed = _protect_abbreviations(chunk_text)
         sents = list(_RE_SENTENCE.finditer(processed))
         if not sents:
             yield (chunk_text, base_index)
             continue
         for sentence in sents:
-            sent_text = _replace_with_separator(
-                sentence.group(), r" ", [_UNDO_AB_SENIOR, _UNDO_AB_ACRONYM]
-            )
+            sent_text = _restore_abbreviations(sentence.group(), inserted_only)
             start_in_chunk = sentence.start()
             yield (sent_text, base_index + start_in_chunk)
 
@@ -163,23 +211,15 @@ def split_sentence(text, best=True) -> Iterator[str]:
         >>> list(split_sentence("Dr. Smith said hello. Mr. Johnson replied."))
         ['Dr. Smith said hello.', 'Mr. Johnson replied.']
     """
-    # Step 1: Preprocess Chinese punctuation by adding newlines
-    # This creates natural break points for Chinese text
-
-    # Add newlines after Chinese sentence endings (。！？) when not followed by quotes
-    text = re.sub(r'([。！？?])([^”’])', r"\1\n\2", text)
-
-    # Add newlines after multiple dots (......) when not followed by quotes
-    text = re.sub(r'(\.{6})([^”’])', r"\1\n\2", text)
-
-    # Add newlines after Chinese ellipsis (……) when not followed by quotes
-    text = re.sub(r'(…{2})([^”’])', r"\1\n\2", text)
-
-    # Add newlines after Chinese punctuation + quotes when not followed by more punctuation
-    text = re.sub(r'([。！？?][”’])([^，。！？?])', r'\1\n\2', text)
+    # Step 1: Split at Chinese punctuation
+    # This creates natural break points for Chinese text: after Chinese sentence
+    # endings (。！？), multiple dots (......) and Chinese ellipsis (……) when not
+    # followed by quotes, and after Chinese punctuation + quotes when not
+    # followed by more punctuation (see _RE_CN_SPLIT)
+    lines = (line for segment, _ in _iter_chunks(text) for line in segment.split("\n"))
 
     # Step 2: Process each chunk (separated by newlines)
-    for chunk in text.split("\n"):
+    for chunk in lines:
         chunk = chunk.strip()
 
         # Skip empty chunks
@@ -191,9 +231,15 @@ def split_sentence(text, best=True) -> Iterator[str]:
             yield chunk
             continue
 
+        # A chunk with nothing to split at is a sentence by itself
+        if not _RE_SENTENCE_BREAK.search(chunk):
+            yield chunk
+            continue
+
         # Step 3: Advanced processing for best mode
         # Temporarily replace abbreviations/acronyms with separators
-        processed = _replace_with_separator(chunk, _SEPARATOR, [_AB_SENIOR, _AB_ACRONYM])
+        inserted_only = _SEPARATOR not in chunk
+        processed = _protect_abbreviations(chunk)
 
         # Find sentence boundaries in the processed text
         sents = list(_RE_SENTENCE.finditer(processed))
@@ -206,7 +252,7 @@ def split_sentence(text, best=True) -> Iterator[str]:
         # Step 4: Process each detected sentence
         for sentence in sents:
             # Restore spaces by replacing separators with actual spaces
-            sentence = _replace_with_separator(sentence.group(), r" ", [_UNDO_AB_SENIOR, _UNDO_AB_ACRONYM])
+            sentence = _restore_abbreviations(sentence.group(), inserted_only)
             yield sentence
 
 # urllib.error.HTTPError: HTTP Error 400: {"detail":"The 2-th sentence exceeds max-length of 150 characters."}
@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+
+from .batch_scheduler import BatchScheduler
+
+
+class TestBatchScheduler(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the batch_scheduler module."""
+
+    async def asyncSetUp(self):
+        self.calls = []
+
+        def batch_fn(texts, allow_pos_ctb, allow_pos_pku):
+            self.calls.append((list(texts), allow_pos_ctb, allow_pos_pku))
+            return [text.upper() for text in texts]
+
+        self.scheduler = BatchScheduler(batch_fn, max_batch=8, max_wait_ms=20)
+
+    async def asyncTearDown(self):
+        await self.scheduler.stop()
+
+    async def test_concurrent_requests_share_a_batch(self):
+        results = await asyncio.gather(*[self.scheduler.submit(text) for text in "abc"])
+        self.assertEqual(results, ["A", "B", "C"])
+        self.assertEqual(self.calls, [(["a", "b", "c"], None, None)])
+
+    async def test_batches_are_split_by_filters(self):
+        results = await asyncio.gather(
+            self.scheduler.submit("a", allow_pos_ctb=frozenset({"NN"})),
+            self.scheduler.submit("b"),
+            self.scheduler.submit("c", allow_pos_ctb=frozenset({"NN"})),
+        )
+        self.assertEqual(results, ["A", "B", "C"])
+        self.assertEqual(sorted(len(call[0]) for call in self.calls), [1, 2])
+
+    async def test_max_batch(self):
+        await asyncio.gather(*[self.scheduler.submit(str(i)) for i in range(10)])
+        self.assertEqual([len(call[0]) for call in self.calls], [8, 2])
+
+    async def test_error_is_raised_for_every_request(self):
+        def failing(texts, allow_pos_ctb, allow_pos_pku):
+            raise RuntimeError("boom")
+
+        scheduler = BatchScheduler(failing)
+        try:
+            results = await asyncio.gather(
+                scheduler.submit("a"), scheduler.submit("b"), return_exceptions=True
+            )
+        finally:
+            await scheduler.stop()
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    async def test_failing_text_only_fails_its_request(self):
+        def batch_fn(texts, allow_pos_ctb, allow_pos_pku):
+            self.calls.append(list(texts))
+            if "bad" in texts:
+                raise RuntimeError("boom")
+            return [text.upper() for text in texts]
+
+        scheduler = BatchScheduler(batch_fn)
+        try:
+            results = await asyncio.gather(
+                scheduler.submit("a"), scheduler.submit("bad"), scheduler.submit("c"),
+                return_exceptions=True
+            )
+            # the scheduler keeps serving requests after a failed batch
+            later = await scheduler.submit("d")
+        finally:
+            await scheduler.stop()
+        self.assertEqual(results[0], "A")
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertEqual(results[2], "C")
+        self.assertEqual(later, "D")
+        self.assertEqual(self.calls, [["a", "bad", "c"], ["a"], ["bad"], ["c"], ["d"]])
+
+    async def test_scheduler_survives_errors_outside_the_batch_function(self):
+        def batch_fn(texts, allow_pos_ctb, allow_pos_pku):
+            # not a list of results, so resolving the futures fails
+            return None if texts == ["a"] else [text.upper() for text in texts]
+
+        scheduler = BatchScheduler(batch_fn)
+        try:
+            with self.assertRaises(TypeError):
+                await scheduler.submit("a")
+            self.assertEqual(await scheduler.submit("b"), "B")
+        finally:
+            await scheduler.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
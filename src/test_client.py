@@ -1,4 +1,5 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
@@ -6,6 +7,15 @@ _BASE_URL = 'http://localhost:5012/api/v1'
 
 
 class TestClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # one keep-alive connection pool for all requests of the tests
+        cls.session = requests.Session()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+
     def test_fine_analysis(self):
         """Test single text fine analysis"""
         url = f"{_BASE_URL}/analysis/fine"
@@ -13,7 +23,7 @@ class TestClient(unittest.TestCase):
             "text": "英伟达和谷歌是世界知名的科技公司",
             "allow_pos_ctb": ["NN", "NR"]
         }
-        response = requests.post(url, json=data)
+        response = self.session.post(url, json=data)
         self.assertEqual(response.status_code, 200)
         result = response.json()
         self.assertIn("terms", result)
@@ -30,7 +40,7 @@ class TestClient(unittest.TestCase):
             ],
             "allow_pos_ctb": ["NN", "NR"]
         }
-        response = requests.post(url, json=data)
+        response = self.session.post(url, json=data)
         self.assertEqual(response.status_code, 200)
         result = response.json()
         self.assertIn("results", result)
@@ -39,6 +49,32 @@ class TestClient(unittest.TestCase):
             self.assertIn("terms", analysis)
             self.assertIn("named_entities", analysis)
 
+    def test_concurrent_fine_analysis(self):
+        """
+        Test concurrent single text requests: every response must belong to its
+        own text. Whether they share a batch is covered by test_batch_scheduler
+        """
+        texts = [
+            "英伟达和谷歌是世界知名的科技公司",
+            "苹果公司是一家创新科技企业",
+            "阿里巴巴是中国最大的电商平台"
+        ]
+        url = f"{_BASE_URL}/analysis/fine"
+        with ThreadPoolExecutor(max_workers=len(texts)) as executor:
+            responses = list(executor.map(
+                lambda text: self.session.post(url, json={"text": text, "allow_pos_ctb": ["NN", "NR"]}),
+                texts
+            ))
+        for text, response in zip(texts, responses):
+            self.assertEqual(response.status_code, 200)
+            result = response.json()
+            self.assertTrue(result["terms"])
+            # spans index into the request's text, so results that were routed
+            # to the wrong request don't line up
+            for term in result["terms"]:
+                start, end = term["span"]
+                self.assertEqual(text[start:end], term["token"])
+
     def test_coarse_analysis(self):
         """Test single text coarse analysis"""
         url = f"{_BASE_URL}/analysis/coarse"
@@ -46,7 +82,7 @@ class TestClient(unittest.TestCase):
             "text": "更美和美呗是医美行业的竞争对手",
             "allow_pos_ctb": ["NN", "NR"]
         }
-        response = requests.post(url, json=data)
+        response = self.session.post(url, json=data)
         self.assertEqual(response.status_code, 200)
         result = response.json()
         self.assertIn("terms", result)
@@ -63,7 +99,7 @@ class TestClient(unittest.TestCase):
             ],
             "allow_pos_ctb": ["NN", "NR"]
         }
-        response = requests.post(url, json=data)
+        response = self.session.post(url, json=data)
         self.assertEqual(response.status_code, 200)
         result = response.json()
         self.assertIn("results", result)
@@ -79,7 +115,7 @@ class TestClient(unittest.TestCase):
             "text": "杭州甘其食是一家连锁包子店",
             "allow_pos_ctb": ["NN", "NR"]
         }
-        response = requests.post(url, json=data)
+        response = self.session.post(url, json=data)
         self.assertEqual(response.status_code, 200)
         result = response.json()
         self.assertIn("fine", result)
@@ -99,7 +135,7 @@ class TestClient(unittest.TestCase):
             ],
             "allow_pos_ctb": ["NN", "NR"]
         }
-        response = requests.post(url, json=data)
+        response = self.session.post(url, json=data)
         self.assertEqual(response.status_code, 200)
         result = response.json()
         self.assertIn("results", result)